@@ -10,35 +10,74 @@ Author: Claude AI
 Version: 1.0.0
 """
 
-import json
+import asyncio
+import hashlib
+import heapq
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import openai
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
+from openai import AsyncOpenAI
+import msgspec
+from msgspec import Struct
 import requests
-from dataclasses import dataclass, asdict
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Clock snapshot shared by everything running inside one workflow
+_now: ContextVar[datetime] = ContextVar('now')
 
-@dataclass
-class FridgeItem:
-    """Represents a single item in the fridge inventory."""
+
+def now() -> datetime:
+    """Return the current workflow's snapshot time, or the wall clock outside one."""
+    try:
+        return _now.get()
+    except LookupError:
+        return datetime.now()
+
+
+@contextmanager
+def frozen_now() -> Iterator[datetime]:
+    """
+    Snapshot datetime.now() once for the duration of the block.
+    
+    Calls to now() inside the block (including tasks started from it) all
+    see the same time. Nested blocks reuse the outer snapshot.
+    """
+    current = _now.get(None)
+    if current is not None:
+        yield current
+        return
+    snapshot = datetime.now()
+    token = _now.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _now.reset(token)
+
+
+class FridgeItem(Struct):
+    """
+    Represents a single item in the fridge inventory.
+    
+    FridgeInventory indexes items by name and expiry_date, so don't reassign
+    those on an item that is in an inventory; remove it and add a new one.
+    """
     name: str
     quantity: int
     unit: str
     expiry_date: str
     category: str = "misc"
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
 
 
-@dataclass
-class GroceryItem:
+class GroceryItem(Struct):
     """Represents a grocery item for shopping."""
     name: str
     quantity: int
@@ -48,26 +87,70 @@ class GroceryItem:
     store_item_id: Optional[str] = None
 
 
+def _parse_expiry(item: FridgeItem) -> date:
+    """Parse an item's expiry date, treating unparseable dates as non-expiring."""
+    try:
+        return date.fromisoformat(item.expiry_date)
+    except ValueError:
+        logger.warning(f"Unparseable expiry date {item.expiry_date!r} for {item.name}; treating as non-expiring")
+        return date.max
+
+
+class MealPlanResponse(Struct):
+    """Expected shape of the JSON meal plan returned by the model."""
+    meal_plan: Dict[str, Dict[str, str]]
+    grocery_list: List[GroceryItem] = []
+    notes: List[str] = []
+
+
 class FridgeInventory:
     """
     Manages the smart fridge inventory system.
     
     Handles loading, saving, and manipulating fridge contents.
     Can work with either a JSON file or hardcoded data.
+    
+    items is exposed for reading only. The name index and expiry heap are kept
+    in sync by add_item/remove_item, so make all changes through those methods.
     """
     
     def __init__(self, inventory_file: str = "fridge_inventory.json"):
         self.inventory_file = inventory_file
+        # Pretty-print the inventory file only when debugging
+        self.debug = os.environ.get('FRIDGE_DEBUG', '').strip().lower() in ('1', 'true', 'yes')
         self.items: List[FridgeItem] = []
+        self._by_name: Dict[str, FridgeItem] = {}
+        # Position of each item in self.items, keyed by id(item)
+        self._positions: Dict[int, int] = {}
+        # Min-heap of (expiry, id(item), item); removed items are tombstoned by id
+        self._expiry_heap: List[Tuple[date, int, FridgeItem]] = []
+        self._removed_ids: Set[int] = set()
+        self._dirty = False
+        self._in_batch = False
+        # Cleared when an existing file fails to load, so defaults never overwrite it
+        self._writable = True
         self.load_inventory()
     
     def load_inventory(self) -> None:
         """Load inventory from JSON file or create default if file doesn't exist."""
+        self._writable = True
         try:
             if os.path.exists(self.inventory_file):
-                with open(self.inventory_file, 'r') as f:
-                    data = json.load(f)
-                    self.items = [FridgeItem(**item) for item in data]
+                with open(self.inventory_file, 'rb') as f:
+                    raw_items = msgspec.json.decode(f.read(), type=List[msgspec.Raw])
+                # Decode entries one by one so a single bad item doesn't discard the rest
+                items = []
+                for raw in raw_items:
+                    try:
+                        items.append(msgspec.json.decode(raw, type=FridgeItem))
+                    except msgspec.ValidationError as e:
+                        logger.warning(f"Skipping invalid inventory entry {bytes(raw)!r}: {e}")
+                if len(items) != len(raw_items):
+                    # Saving now would silently drop the skipped entries from the file
+                    logger.error(f"Not saving changes over {self.inventory_file} until its invalid entries are fixed")
+                    self._writable = False
+                self.items = items
+                self._rebuild_index()
                 logger.info(f"Loaded {len(self.items)} items from {self.inventory_file}")
             else:
                 # Create default inventory if file doesn't exist
@@ -76,6 +159,9 @@ class FridgeInventory:
                 logger.info("Created default inventory")
         except Exception as e:
             logger.error(f"Error loading inventory: {e}")
+            if os.path.exists(self.inventory_file):
+                logger.error(f"Not saving changes over unreadable {self.inventory_file}")
+                self._writable = False
             self._create_default_inventory()
     
     def _create_default_inventory(self) -> None:
@@ -93,22 +179,98 @@ class FridgeInventory:
             FridgeItem("Rice", 2, "cups", "2026-01-01", "grain")
         ]
         self.items = default_items
+        self._rebuild_index()
+    
+    def _rebuild_index(self) -> None:
+        """
+        Rebuild the name lookup index, positions and expiry heap from self.items.
+        
+        Items whose names differ only by case are merged into the first one,
+        summing quantities and keeping the earliest expiry date, so every
+        remaining item is reachable by name and nothing expires later than it did.
+        """
+        self._by_name = {}
+        merged = []
+        for item in self.items:
+            key = item.name.casefold()
+            existing_item = self._by_name.get(key)
+            if existing_item is None:
+                self._by_name[key] = item
+                merged.append(item)
+            else:
+                logger.info(f"Merging duplicate inventory entry {item.name} into {existing_item.name}")
+                existing_item.quantity += item.quantity
+                if _parse_expiry(item) < _parse_expiry(existing_item):
+                    existing_item.expiry_date = item.expiry_date
+        self.items = merged
+        self._positions = {id(item): idx for idx, item in enumerate(self.items)}
+        self._expiry_heap = [(_parse_expiry(item), id(item), item) for item in self.items]
+        heapq.heapify(self._expiry_heap)
+        self._removed_ids = set()
     
     def save_inventory(self) -> None:
         """Save current inventory to JSON file."""
+        if not self._writable:
+            logger.warning(f"Skipping save: {self.inventory_file} could not be loaded; fix or remove it first")
+            return
         try:
-            with open(self.inventory_file, 'w') as f:
-                json.dump([item.to_dict() for item in self.items], f, indent=2)
+            buf = msgspec.json.encode(self.items)
+            if self.debug:
+                buf = msgspec.json.format(buf, indent=2)
+            # Serialize up front; the buffered writer passes one large write through
+            with open(self.inventory_file, 'wb') as f:
+                f.write(buf)
+            self._dirty = False
             logger.info(f"Saved inventory to {self.inventory_file}")
         except Exception as e:
             logger.error(f"Error saving inventory: {e}")
     
+    def _mark_dirty(self) -> None:
+        """Record a mutation and save immediately unless inside a batch."""
+        self._dirty = True
+        if not self._in_batch:
+            self.save_inventory()
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer inventory saves until the end of the block.
+        
+        Mutations made inside the block are written with a single
+        save_inventory() call on exit. Nested batches flush once, when the
+        outermost block exits.
+        """
+        outer = self._in_batch
+        self._in_batch = True
+        try:
+            yield
+        finally:
+            self._in_batch = outer
+            if not outer and self._dirty:
+                self.save_inventory()
+    
     def get_expiring_soon(self, days: int = 3) -> List[FridgeItem]:
-        """Get items expiring within specified days."""
-        cutoff_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
-        expiring = [item for item in self.items 
-                   if item.expiry_date <= cutoff_date]
-        return expiring
+        """Get items expiring within specified days, soonest first."""
+        cutoff_date = (now() + timedelta(days=days)).date()
+        heap = self._expiry_heap
+        # Pop only the entries inside the window, then push the live ones back
+        expiring = []
+        while heap and heap[0][0] <= cutoff_date:
+            entry = heapq.heappop(heap)
+            if entry[1] in self._removed_ids:
+                self._removed_ids.discard(entry[1])
+                continue
+            expiring.append(entry)
+        for entry in expiring:
+            heapq.heappush(heap, entry)
+        return [entry[2] for entry in expiring]
+    
+    def _compact_expiry_heap(self) -> None:
+        """Drop tombstoned entries so removed items aren't kept alive by the heap."""
+        removed = self._removed_ids
+        self._expiry_heap = [entry for entry in self._expiry_heap if entry[1] not in removed]
+        heapq.heapify(self._expiry_heap)
+        self._removed_ids = set()
     
     def get_low_stock(self, threshold: int = 2) -> List[FridgeItem]:
         """Get items with low stock (quantity below threshold)."""
@@ -116,38 +278,223 @@ class FridgeInventory:
     
     def remove_item(self, name: str, quantity: int = 1) -> bool:
         """Remove quantity of an item from inventory."""
-        for item in self.items:
-            if item.name.lower() == name.lower():
-                if item.quantity >= quantity:
-                    item.quantity -= quantity
-                    if item.quantity == 0:
-                        self.items.remove(item)
-                    self.save_inventory()
-                    return True
-                else:
-                    logger.warning(f"Not enough {name} in inventory")
-                    return False
-        logger.warning(f"{name} not found in inventory")
-        return False
+        key = name.casefold()
+        item = self._by_name.get(key)
+        if item is None:
+            logger.warning(f"{name} not found in inventory")
+            return False
+        if item.quantity < quantity:
+            logger.warning(f"Not enough {name} in inventory")
+            return False
+        item.quantity -= quantity
+        if item.quantity == 0:
+            # Swap-delete: item order is not significant, so fill the gap with the last item
+            idx = self._positions.pop(id(item))
+            last = self.items.pop()
+            if idx != len(self.items):
+                self.items[idx] = last
+                self._positions[id(last)] = idx
+            del self._by_name[key]
+            self._removed_ids.add(id(item))
+            if len(self._removed_ids) > len(self.items):
+                self._compact_expiry_heap()
+        self._mark_dirty()
+        return True
     
     def add_item(self, item: FridgeItem) -> None:
         """Add a new item to inventory or update existing quantity."""
-        for existing_item in self.items:
-            if existing_item.name.lower() == item.name.lower():
-                existing_item.quantity += item.quantity
-                self.save_inventory()
-                return
-        self.items.append(item)
-        self.save_inventory()
+        key = item.name.casefold()
+        existing_item = self._by_name.get(key)
+        if existing_item is not None:
+            existing_item.quantity += item.quantity
+        else:
+            self._positions[id(item)] = len(self.items)
+            self.items.append(item)
+            self._by_name[key] = item
+            if id(item) in self._removed_ids:
+                # Re-added after removal: its old heap entry is still there
+                self._removed_ids.discard(id(item))
+            else:
+                heapq.heappush(self._expiry_heap, (_parse_expiry(item), id(item), item))
+        self._mark_dirty()
     
     def get_inventory_summary(self) -> Dict[str, List[FridgeItem]]:
         """Get inventory organized by category."""
-        summary = {}
+        summary: Dict[str, List[FridgeItem]] = defaultdict(list)
         for item in self.items:
-            if item.category not in summary:
-                summary[item.category] = []
             summary[item.category].append(item)
-        return summary
+        return dict(summary)
+    
+    def summarize(self, days: int = 3, threshold: int = 2
+                  ) -> Tuple[List[FridgeItem], List[FridgeItem], Dict[str, List[FridgeItem]]]:
+        """
+        Collect expiring, low-stock and per-category items together.
+        
+        Expiring items come from get_expiring_soon() (soonest first); low-stock
+        and per-category items are collected in a single pass over the inventory.
+        
+        Args:
+            days: Expiry window in days (see get_expiring_soon)
+            threshold: Low-stock quantity threshold (see get_low_stock)
+        
+        Returns:
+            Tuple of (expiring items, low-stock items, items by category)
+        """
+        expiring = self.get_expiring_soon(days)
+        low_stock = []
+        by_category: Dict[str, List[FridgeItem]] = defaultdict(list)
+        for item in self.items:
+            if item.quantity <= threshold:
+                low_stock.append(item)
+            by_category[item.category].append(item)
+        return expiring, low_stock, dict(by_category)
+    
+    def count_summary(self, days: int = 3, threshold: int = 2) -> Tuple[List[str], int, int]:
+        """
+        Count categories, expiring and low-stock items without building item lists.
+        
+        The expiring count comes from the expiry heap (see get_expiring_soon);
+        categories and the low-stock count are tallied in one pass.
+        
+        Returns:
+            Tuple of (categories in first-seen order, expiring count, low-stock count)
+        """
+        categories = {}
+        low_count = 0
+        for item in self.items:
+            categories[item.category] = None
+            if item.quantity <= threshold:
+                low_count += 1
+        return list(categories), len(self.get_expiring_soon(days)), low_count
+
+
+# Static meal planning instructions. Kept byte-for-byte identical across
+# requests and sent first so provider-side prompt caching can reuse the prefix;
+# the per-request inventory, day count and diet follow in the user message.
+STATIC_SYSTEM_PROMPT = """\
+You are the meal planning engine of GroceryConcierge, a smart fridge assistant.
+Each request gives you the current fridge inventory, the number of days to plan
+for and the household's dietary preferences or restrictions. You reply with a
+meal plan, a grocery shopping list for anything the plan needs that the fridge
+does not contain, and a few practical notes.
+
+Input format
+------------
+The user message always has exactly these three sections:
+
+Inventory:
+- <item name>: <quantity> <unit> (expires: <YYYY-MM-DD>)
+- ...
+Days: <number of days to plan, N>
+Diet: <comma-separated preferences and restrictions, or "none">
+
+Planning rules
+--------------
+1. Plan exactly N days. Each day has exactly three meals: breakfast, lunch and
+   dinner. Do not add snacks, desserts or extra meals.
+2. Use the fridge inventory as much as possible. Prefer recipes that combine
+   several inventory items over recipes that need many new purchases.
+3. Prioritize items that expire soonest. Order the plan so that items with
+   the earliest expiry dates are used in the first days' meals, and items
+   with distant expiry dates are used later or kept for future plans.
+4. Respect every dietary preference and restriction. "vegetarian" excludes meat,
+   poultry and seafood. "vegan" additionally excludes dairy, eggs and honey.
+   "gluten-free" excludes wheat, barley, rye and regular pasta or bread.
+   "dairy-free" excludes milk, cheese, butter, cream and yogurt. "pescatarian"
+   allows seafood but no other meat. Treat any other restriction literally and
+   conservatively. If an inventory item conflicts with the diet, do not use it.
+5. Keep quantities realistic for the inventory. Do not plan to use more of an
+   item than is available; if more is needed, add the difference to the
+   grocery list.
+6. Reuse leftovers sensibly: a large dinner may become the next day's lunch.
+   Avoid serving the same dinner on consecutive days.
+7. Describe each meal in one short line, naming the main ingredients, for
+   example "Spinach and cheese omelette with toast". Do not include full
+   recipes, cooking times or calorie counts in the meal descriptions.
+
+Grocery list rules
+------------------
+1. List only items that the meal plan needs and that are missing from the
+   inventory or present in insufficient quantity.
+2. Merge duplicates: each item appears once, with the total quantity needed.
+3. "name" is a common singular or mass noun as sold in a supermarket, in title
+   case, without brand names or preparation details, for example "Spinach",
+   "Salmon", "Olive Oil", "Chicken Breast".
+4. "quantity" is a positive whole number. Round up partial amounts.
+5. "unit" is the unit the item is sold in, for example "piece", "lb", "oz",
+   "bag", "box", "bottle", "bunch", "head", "dozen", "gallon", "loaf", "can".
+6. "category" must be one of: "dairy", "meat", "seafood", "vegetable",
+   "fruit", "grain", "condiment", "spice", "beverage", "frozen", "misc".
+7. "reason" briefly names the meal or meals the item is for.
+8. Do not list pantry staples assumed to be on hand: water, salt and black
+   pepper.
+
+Notes rules
+-----------
+Give two to five short notes. Good notes mention which items to use first
+because they expire soon, batch cooking or prep-ahead opportunities, storage
+tips that extend shelf life, and substitutions for items that may be hard to
+find. Do not repeat the meal plan in the notes.
+
+Output format
+-------------
+Respond with a single JSON object and nothing else: no markdown, no code
+fences, no commentary before or after it. Use exactly these keys:
+
+{
+    "meal_plan": {
+        "day_1": {"breakfast": "...", "lunch": "...", "dinner": "..."},
+        "day_2": {"breakfast": "...", "lunch": "...", "dinner": "..."}
+    },
+    "grocery_list": [
+        {"name": "...", "quantity": 1, "unit": "...", "category": "...", "reason": "..."}
+    ],
+    "notes": ["..."]
+}
+
+"meal_plan" has keys "day_1" through "day_N" in order. "grocery_list" may be
+an empty array if nothing needs to be bought. All strings use plain ASCII
+where possible.
+
+Example
+-------
+For this input:
+
+Inventory:
+- Eggs: 6 pieces (expires: 2025-07-24)
+- Spinach: 1 bag (expires: 2025-07-21)
+- Rice: 2 cups (expires: 2026-01-01)
+Days: 2
+Diet: vegetarian
+
+A valid response is:
+
+{
+    "meal_plan": {
+        "day_1": {
+            "breakfast": "Spinach and egg scramble",
+            "lunch": "Egg fried rice with spinach",
+            "dinner": "Black bean and rice bowl with sauteed spinach"
+        },
+        "day_2": {
+            "breakfast": "Boiled eggs with toast",
+            "lunch": "Leftover black bean and rice bowl",
+            "dinner": "Vegetable curry with rice"
+        }
+    },
+    "grocery_list": [
+        {"name": "Black Beans", "quantity": 1, "unit": "can", "category": "grain", "reason": "rice bowl on day 1"},
+        {"name": "Bread", "quantity": 1, "unit": "loaf", "category": "grain", "reason": "toast on day 2"},
+        {"name": "Mixed Vegetables", "quantity": 1, "unit": "bag", "category": "frozen", "reason": "curry on day 2"},
+        {"name": "Curry Paste", "quantity": 1, "unit": "jar", "category": "condiment", "reason": "curry on day 2"}
+    ],
+    "notes": [
+        "Use the spinach on day 1; bagged greens wilt within a few days of opening.",
+        "Cook extra rice on day 1 and refrigerate it for the fried rice and curry.",
+        "Frozen mixed vegetables keep for months and make a quick curry base."
+    ]
+}
+"""
 
 
 class MealPlanner:
@@ -157,15 +504,30 @@ class MealPlanner:
     Generates meal plans based on available ingredients and dietary preferences.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize with OpenAI API key."""
+    def __init__(self, 
+                 api_key: Optional[str] = None,
+                 cache_ttl: float = 3600.0,
+                 max_cache_entries: int = 32):
+        """
+        Initialize with OpenAI API key.
+        
+        Args:
+            api_key: OpenAI API key (falls back to OPENAI_API_KEY)
+            cache_ttl: Seconds a generated meal plan is reused for identical input
+            max_cache_entries: Maximum number of cached meal plans
+        """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+        # Validated plans are cached as encoded JSON and decoded fresh on each hit
+        self._cache: Dict[bytes, Tuple[float, bytes]] = {}
+        self.client: Optional[AsyncOpenAI] = None
         if self.api_key:
-            openai.api_key = self.api_key
+            self.client = AsyncOpenAI(api_key=self.api_key)
         else:
             logger.warning("OpenAI API key not provided. Using mock responses.")
     
-    def generate_meal_plan(self, 
+    async def generate_meal_plan(self, 
                           inventory: List[FridgeItem], 
                           days: int = 7,
                           dietary_preferences: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -183,68 +545,88 @@ class MealPlanner:
         if not self.api_key:
             return self._generate_mock_meal_plan(inventory, days)
         
+        cache_key = self._cache_key(inventory, days, dietary_preferences)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            created_at, cached_plan = cached
+            if time.monotonic() - created_at < self.cache_ttl:
+                logger.info(f"Using cached {days}-day meal plan")
+                # Move to the most-recently-used end so eviction is LRU
+                self._cache[cache_key] = self._cache.pop(cache_key)
+                # Decode a fresh copy so callers can't mutate the cached plan
+                return msgspec.structs.asdict(
+                    msgspec.json.decode(cached_plan, type=MealPlanResponse)
+                )
+            del self._cache[cache_key]
+        
         try:
-            # Create inventory string for GPT prompt
+            # Only the variable part goes in the user message; the static
+            # instructions stay in the system message so the prefix is cacheable
             inventory_str = "\n".join([
                 f"- {item.name}: {item.quantity} {item.unit} (expires: {item.expiry_date})"
                 for item in inventory
             ])
+            dietary_str = ", ".join(dietary_preferences) if dietary_preferences else "none"
             
-            dietary_str = ""
-            if dietary_preferences:
-                dietary_str = f"\nDietary preferences/restrictions: {', '.join(dietary_preferences)}"
-            
-            prompt = f"""
-            Create a {days}-day meal plan using the following fridge inventory as much as possible:
-            
-            {inventory_str}
-            {dietary_str}
-            
-            Please provide:
-            1. A day-by-day meal plan (breakfast, lunch, dinner)
-            2. A grocery shopping list for missing ingredients
-            3. Prioritize using items that expire soon
-            
-            Format as JSON with structure:
-            {{
-                "meal_plan": {{
-                    "day_1": {{"breakfast": "...", "lunch": "...", "dinner": "..."}},
-                    ...
-                }},
-                "grocery_list": [
-                    {{"name": "item", "quantity": 1, "unit": "piece", "category": "vegetable", "reason": "for recipe X"}}
-                ],
-                "notes": ["helpful cooking tips or substitutions"]
-            }}
-            """
-            
-            response = openai.ChatCompletion.create(
+            stream = await self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": STATIC_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Inventory:\n{inventory_str}\nDays: {days}\nDiet: {dietary_str}"}
+                ],
                 max_tokens=2000,
-                temperature=0.7
+                temperature=0.7,
+                response_format={"type": "json_object"},
+                stream=True
             )
             
-            # Parse the JSON response
-            content = response.choices[0].message.content
-            meal_plan = json.loads(content)
+            # Accumulate streamed tokens into the full JSON document
+            parts = []
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+            content = "".join(parts)
+            
+            # Decode and validate the JSON response in one pass
+            response = msgspec.json.decode(content, type=MealPlanResponse)
+            meal_plan = msgspec.structs.asdict(response)
             
             logger.info(f"Generated {days}-day meal plan with {len(meal_plan.get('grocery_list', []))} shopping items")
+            self._store_cached(cache_key, msgspec.json.encode(response))
             return meal_plan
             
         except Exception as e:
             logger.error(f"Error generating meal plan: {e}")
             return self._generate_mock_meal_plan(inventory, days)
     
+    def _cache_key(self, 
+                   inventory: List[FridgeItem], 
+                   days: int,
+                   dietary_preferences: Optional[List[str]]) -> bytes:
+        """Hash the inputs that determine a meal plan into a cache key."""
+        payload = [
+            [(item.name, item.quantity, item.expiry_date)
+             for item in sorted(inventory, key=lambda x: x.name)],
+            days,
+            dietary_preferences or []
+        ]
+        return hashlib.blake2b(msgspec.json.encode(payload)).digest()
+    
+    def _store_cached(self, cache_key: bytes, meal_plan: bytes) -> None:
+        """Cache an encoded meal plan, evicting the least recently used entry when full."""
+        if cache_key not in self._cache and len(self._cache) >= self.max_cache_entries:
+            del self._cache[next(iter(self._cache))]
+        self._cache[cache_key] = (time.monotonic(), meal_plan)
+    
     def _generate_mock_meal_plan(self, inventory: List[FridgeItem], days: int) -> Dict[str, Any]:
         """Generate a mock meal plan when API is not available."""
         mock_plan = {
             "meal_plan": {},
             "grocery_list": [
-                GroceryItem("Spinach", 1, "bag", "vegetable", 2.99).__dict__,
-                GroceryItem("Salmon", 1, "lb", "seafood", 12.99).__dict__,
-                GroceryItem("Pasta", 1, "box", "grain", 1.49).__dict__,
-                GroceryItem("Olive Oil", 1, "bottle", "condiment", 4.99).__dict__
+                GroceryItem("Spinach", 1, "bag", "vegetable", 2.99),
+                GroceryItem("Salmon", 1, "lb", "seafood", 12.99),
+                GroceryItem("Pasta", 1, "box", "grain", 1.49),
+                GroceryItem("Olive Oil", 1, "bottle", "condiment", 4.99)
             ],
             "notes": [
                 "This is a mock meal plan. Connect OpenAI API for personalized planning.",
@@ -286,6 +668,14 @@ class GroceryManager:
             "pasta": {"price": 1.49, "unit": "box", "available": True, "store_id": "PAST001"},
             "olive oil": {"price": 4.99, "unit": "bottle", "available": True, "store_id": "OIL001"}
         }
+        self.refresh_catalog()
+    
+    def refresh_catalog(self) -> None:
+        """Rebuild the search lookup table after store_catalog changes."""
+        self._catalog_tuples: Dict[str, Tuple[str, float, str, bool]] = {
+            key.casefold(): (entry["store_id"], entry["price"], entry["unit"], entry["available"])
+            for key, entry in self.store_catalog.items()
+        }
     
     def search_products(self, grocery_list: List[GroceryItem]) -> List[Dict[str, Any]]:
         """
@@ -297,33 +687,36 @@ class GroceryManager:
         Returns:
             List of found products with pricing and availability
         """
-        found_products = []
-        
-        for item in grocery_list:
-            # Simulate API search
-            item_key = item.name.lower()
-            if item_key in self.store_catalog:
-                store_item = self.store_catalog[item_key]
-                found_products.append({
-                    "requested_item": item.__dict__,
-                    "store_item": {
-                        "name": item.name,
-                        "store_id": store_item["store_id"],
-                        "price": store_item["price"],
-                        "unit": store_item["unit"],
-                        "available": store_item["available"],
-                        "total_cost": store_item["price"] * item.quantity
-                    }
-                })
-            else:
+        found = 0
+        
+        def build_result(item: GroceryItem, entry: Optional[Tuple[str, float, str, bool]]) -> Dict[str, Any]:
+            nonlocal found
+            if entry is None:
                 # Item not found in catalog
-                found_products.append({
-                    "requested_item": item.__dict__,
+                return {
+                    "requested_item": item,
                     "store_item": None,
                     "error": "Product not found in store catalog"
-                })
+                }
+            found += 1
+            store_id, price, unit, available = entry
+            return {
+                "requested_item": item,
+                "store_item": {
+                    "name": item.name,
+                    "store_id": store_id,
+                    "price": price,
+                    "unit": unit,
+                    "available": available,
+                    "total_cost": price * item.quantity
+                }
+            }
+        
+        # Simulate API search
+        catalog = self._catalog_tuples
+        found_products = [build_result(item, catalog.get(item.name.casefold())) for item in grocery_list]
         
-        logger.info(f"Found {len([p for p in found_products if p.get('store_item')])} out of {len(grocery_list)} items")
+        logger.info(f"Found {found} out of {len(grocery_list)} items")
         return found_products
     
     def create_order(self, products: List[Dict[str, Any]], delivery_time: Optional[str] = None) -> Dict[str, Any]:
@@ -350,16 +743,16 @@ class GroceryManager:
         
         # Generate mock order
         order = {
-            "order_id": f"ORD_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "order_id": f"ORD_{now().strftime('%Y%m%d_%H%M%S')}",
             "status": "confirmed",
             "items": available_products,
             "subtotal": round(total_cost, 2),
             "delivery_fee": delivery_fee,
             "tip": round(tip, 2),
             "total": round(total_with_fees, 2),
-            "estimated_delivery": delivery_time or (datetime.now() + timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"),
+            "estimated_delivery": delivery_time or (now() + timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"),
             "store": "Mock Grocery Store",
-            "created_at": datetime.now().isoformat()
+            "created_at": now().isoformat()
         }
         
         logger.info(f"Created order {order['order_id']} for ${order['total']:.2f}")
@@ -370,7 +763,7 @@ class GroceryManager:
         return {
             "order_id": order_id,
             "status": "in_progress",
-            "estimated_delivery": (datetime.now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M"),
+            "estimated_delivery": (now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M"),
             "driver": "Mock Driver",
             "tracking_url": f"https://mockstore.com/track/{order_id}"
         }
@@ -386,6 +779,8 @@ class CalendarManager:
     def __init__(self, calendar_credentials: Optional[str] = None):
         self.credentials = calendar_credentials
         self.events = []  # Mock event storage
+        # Epoch seconds per start_time string, so start times are parsed once
+        self._start_ts: Dict[str, int] = {}
     
     def schedule_delivery_reminder(self, order: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -409,6 +804,7 @@ class CalendarManager:
             "type": "delivery_reminder",
             "status": "scheduled"
         }
+        self._start_ts[event["start_time"]] = int(delivery_time.timestamp())
         
         self.events.append(event)
         logger.info(f"Scheduled delivery reminder for {delivery_time.strftime('%Y-%m-%d %H:%M')}")
@@ -425,7 +821,7 @@ class CalendarManager:
             List of scheduled events
         """
         events = []
-        base_date = datetime.now().replace(hour=18, minute=0, second=0, microsecond=0)  # 6 PM start
+        base_date = now().replace(hour=18, minute=0, second=0, microsecond=0)  # 6 PM start
         
         for day_key, meals in meal_plan.get('meal_plan', {}).items():
             day_num = int(day_key.split('_')[1]) - 1
@@ -440,6 +836,7 @@ class CalendarManager:
                 "type": "meal_prep",
                 "status": "scheduled"
             }
+            self._start_ts[event["start_time"]] = int(event_date.timestamp())
             
             events.append(event)
             self.events.append(event)
@@ -449,12 +846,20 @@ class CalendarManager:
     
     def get_upcoming_events(self, days: int = 7) -> List[Dict[str, Any]]:
         """Get upcoming events for the next specified days."""
-        cutoff_date = datetime.now() + timedelta(days=days)
-        upcoming = [
-            event for event in self.events
-            if datetime.fromisoformat(event['start_time']) <= cutoff_date
-        ]
-        return sorted(upcoming, key=lambda x: x['start_time'])
+        # Compare cached epoch seconds instead of re-parsing start_time per comparison
+        cutoff_ts = int((now() + timedelta(days=days)).timestamp())
+        timed = [(self._event_ts(event['start_time']), event) for event in self.events]
+        upcoming = [pair for pair in timed if pair[0] <= cutoff_ts]
+        upcoming.sort(key=itemgetter(0))
+        return [event for _, event in upcoming]
+    
+    def _event_ts(self, start_time: str) -> int:
+        """Return epoch seconds for an event start time, parsing it at most once."""
+        ts = self._start_ts.get(start_time)
+        if ts is None:
+            ts = int(datetime.fromisoformat(start_time).timestamp())
+            self._start_ts[start_time] = ts
+        return ts
 
 
 class GroceryConcierge:
@@ -490,34 +895,34 @@ class GroceryConcierge:
         Returns:
             Dictionary with daily insights and recommendations
         """
-        logger.info("Performing daily fridge check...")
-        
-        # Check expiring items
-        expiring_items = self.fridge.get_expiring_soon(days=3)
-        low_stock_items = self.fridge.get_low_stock(threshold=2)
-        
-        insights = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "expiring_soon": [item.__dict__ for item in expiring_items],
-            "low_stock": [item.__dict__ for item in low_stock_items],
-            "total_items": len(self.fridge.items),
-            "recommendations": []
-        }
-        
-        # Generate recommendations
-        if expiring_items:
-            insights["recommendations"].append(f"Use {len(expiring_items)} expiring items in today's meals")
-        
-        if low_stock_items:
-            insights["recommendations"].append(f"Consider restocking {len(low_stock_items)} low-stock items")
-        
-        if not expiring_items and not low_stock_items:
-            insights["recommendations"].append("Your fridge is well-stocked and organized!")
-        
-        logger.info(f"Daily check complete: {len(expiring_items)} expiring, {len(low_stock_items)} low stock")
-        return insights
+        with frozen_now():
+            logger.info("Performing daily fridge check...")
+            
+            # Check expiring and low-stock items
+            expiring_items, low_stock_items, _ = self.fridge.summarize(days=3, threshold=2)
+            
+            insights = {
+                "date": now().strftime("%Y-%m-%d"),
+                "expiring_soon": expiring_items,
+                "low_stock": low_stock_items,
+                "total_items": len(self.fridge.items),
+                "recommendations": []
+            }
+            
+            # Generate recommendations
+            if expiring_items:
+                insights["recommendations"].append(f"Use {len(expiring_items)} expiring items in today's meals")
+            
+            if low_stock_items:
+                insights["recommendations"].append(f"Consider restocking {len(low_stock_items)} low-stock items")
+            
+            if not expiring_items and not low_stock_items:
+                insights["recommendations"].append("Your fridge is well-stocked and organized!")
+            
+            logger.info(f"Daily check complete: {len(expiring_items)} expiring, {len(low_stock_items)} low stock")
+            return insights
     
-    def plan_and_order(self, 
+    async def plan_and_order(self, 
                       days: int = 7, 
                       dietary_preferences: Optional[List[str]] = None,
                       auto_order: bool = False) -> Dict[str, Any]:
@@ -532,71 +937,72 @@ class GroceryConcierge:
         Returns:
             Complete workflow results
         """
-        logger.info(f"Starting {days}-day meal planning and ordering workflow...")
-        
-        # Step 1: Generate meal plan
-        meal_plan = self.meal_planner.generate_meal_plan(
-            self.fridge.items, 
-            days=days, 
-            dietary_preferences=dietary_preferences
-        )
-        
-        # Step 2: Process grocery list
-        grocery_items = [
-            GroceryItem(**item) for item in meal_plan.get('grocery_list', [])
-        ]
-        
-        # Step 3: Search products and get pricing
-        products = self.grocery_manager.search_products(grocery_items)
-        
-        workflow_result = {
-            "meal_plan": meal_plan,
-            "grocery_search_results": products,
-            "total_estimated_cost": 0,
-            "order": None,
-            "calendar_events": []
-        }
-        
-        # Calculate estimated cost
-        available_products = [p for p in products if p.get('store_item')]
-        if available_products:
-            workflow_result["total_estimated_cost"] = sum(
-                p['store_item']['total_cost'] for p in available_products
+        with frozen_now():
+            logger.info(f"Starting {days}-day meal planning and ordering workflow...")
+            
+            # Step 1: Generate meal plan
+            meal_plan = await self.meal_planner.generate_meal_plan(
+                self.fridge.items, 
+                days=days, 
+                dietary_preferences=dietary_preferences
             )
-        
-        # Step 4: Auto-order if requested
-        if auto_order and available_products:
-            preferred_delivery = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d 16:00")
-            order = self.grocery_manager.create_order(available_products, preferred_delivery)
-            workflow_result["order"] = order
             
-            # Step 5: Schedule calendar events
-            if order and "error" not in order:
-                delivery_event = self.calendar.schedule_delivery_reminder(order)
-                meal_events = self.calendar.schedule_meal_prep_reminders(meal_plan)
-                workflow_result["calendar_events"] = [delivery_event] + meal_events
-        
-        logger.info("Meal planning and ordering workflow completed")
-        return workflow_result
+            # Step 2: Process grocery list (already GroceryItem structs)
+            grocery_items = meal_plan.get('grocery_list', [])
+            
+            # Step 3: Search products and get pricing
+            products = self.grocery_manager.search_products(grocery_items)
+            
+            workflow_result = {
+                "meal_plan": meal_plan,
+                "grocery_search_results": products,
+                "total_estimated_cost": 0,
+                "order": None,
+                "calendar_events": []
+            }
+            
+            # Calculate estimated cost
+            available_products = [p for p in products if p.get('store_item')]
+            if available_products:
+                workflow_result["total_estimated_cost"] = sum(
+                    p['store_item']['total_cost'] for p in available_products
+                )
+            
+            # Step 4: Auto-order if requested
+            if auto_order and available_products:
+                preferred_delivery = (now() + timedelta(days=1)).strftime("%Y-%m-%d 16:00")
+                order = self.grocery_manager.create_order(available_products, preferred_delivery)
+                workflow_result["order"] = order
+                
+                # Step 5: Schedule calendar events
+                if order and "error" not in order:
+                    delivery_event = self.calendar.schedule_delivery_reminder(order)
+                    meal_events = self.calendar.schedule_meal_prep_reminders(meal_plan)
+                    workflow_result["calendar_events"] = [delivery_event] + meal_events
+            
+            logger.info("Meal planning and ordering workflow completed")
+            return workflow_result
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get comprehensive system status."""
-        return {
-            "fridge_status": {
-                "total_items": len(self.fridge.items),
-                "categories": list(self.fridge.get_inventory_summary().keys()),
-                "expiring_soon": len(self.fridge.get_expiring_soon()),
-                "low_stock": len(self.fridge.get_low_stock())
-            },
-            "upcoming_events": len(self.calendar.get_upcoming_events()),
-            "system_time": datetime.now().isoformat(),
-            "components": {
-                "fridge": "operational",
-                "meal_planner": "operational" if self.meal_planner.api_key else "mock_mode",
-                "grocery_manager": "operational",
-                "calendar": "operational"
+        with frozen_now():
+            categories, expiring_count, low_count = self.fridge.count_summary()
+            return {
+                "fridge_status": {
+                    "total_items": len(self.fridge.items),
+                    "categories": categories,
+                    "expiring_soon": expiring_count,
+                    "low_stock": low_count
+                },
+                "upcoming_events": len(self.calendar.get_upcoming_events()),
+                "system_time": now().isoformat(),
+                "components": {
+                    "fridge": "operational",
+                    "meal_planner": "operational" if self.meal_planner.api_key else "mock_mode",
+                    "grocery_manager": "operational",
+                    "calendar": "operational"
+                }
             }
-        }
 
 
 def main():
@@ -622,12 +1028,12 @@ def main():
     if daily_insights['expiring_soon']:
         print(f"\n⚠️  Expiring soon ({len(daily_insights['expiring_soon'])} items):")
         for item in daily_insights['expiring_soon']:
-            print(f"  - {item['name']}: {item['quantity']} {item['unit']} (expires {item['expiry_date']})")
+            print(f"  - {item.name}: {item.quantity} {item.unit} (expires {item.expiry_date})")
     
     if daily_insights['low_stock']:
         print(f"\n📉 Low stock ({len(daily_insights['low_stock'])} items):")
         for item in daily_insights['low_stock']:
-            print(f"  - {item['name']}: {item['quantity']} {item['unit']}")
+            print(f"  - {item.name}: {item.quantity} {item.unit}")
     
     print(f"\n💡 Recommendations:")
     for rec in daily_insights['recommendations']:
@@ -637,11 +1043,11 @@ def main():
     print("\n\n🍽️  Generating 7-Day Meal Plan:")
     print("=" * 50)
     
-    workflow_result = concierge.plan_and_order(
+    workflow_result = asyncio.run(concierge.plan_and_order(
         days=7, 
         dietary_preferences=['vegetarian'],  # Example preference
         auto_order=False  # Set to True to simulate auto-ordering
-    )
+    ))
     
     # Display meal plan
     meal_plan = workflow_result['meal_plan']
@@ -665,9 +1071,9 @@ def main():
         if store_item:
             cost = store_item['total_cost']
             total_cost += cost
-            print(f"✅ {item['name']}: {item['quantity']} {item['unit']} - ${cost:.2f}")
+            print(f"✅ {item.name}: {item.quantity} {item.unit} - ${cost:.2f}")
         else:
-            print(f"❌ {item['name']}: Not available")
+            print(f"❌ {item.name}: Not available")
     
     print(f"\nEstimated total: ${total_cost:.2f}")
     
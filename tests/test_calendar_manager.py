@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta
+
+from main import CalendarManager
+
+
+def test_upcoming_events_sorted_and_filtered():
+    calendar = CalendarManager()
+    plan = {"meal_plan": {f"day_{day}": {"dinner": "Soup"} for day in range(1, 11)}}
+    events = calendar.schedule_meal_prep_reminders(plan)
+    assert all("_start_ts" not in event for event in events)
+    upcoming = calendar.get_upcoming_events(days=3)
+    assert [event["event_id"] for event in upcoming] == [f"MEAL_PREP_day_{day}" for day in range(1, len(upcoming) + 1)]
+    assert 2 <= len(upcoming) <= 4
+
+
+def test_upcoming_events_accepts_external_events():
+    calendar = CalendarManager()
+    soon = datetime.now() + timedelta(hours=1)
+    calendar.events.append({"event_id": "EXTERNAL", "start_time": soon.isoformat()})
+    calendar.events.append({"event_id": "LATER", "start_time": (soon + timedelta(days=30)).isoformat()})
+    assert [event["event_id"] for event in calendar.get_upcoming_events()] == ["EXTERNAL"]
@@ -0,0 +1,135 @@
+import copy
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from main import FridgeInventory, FridgeItem
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    return FridgeInventory(str(tmp_path / "fridge_inventory.json"))
+
+
+def _expiry(item):
+    return date.fromisoformat(item.expiry_date)
+
+
+def _linear_expiring(inventory, days):
+    cutoff_date = date.today() + timedelta(days=days)
+    return sorted((item for item in inventory.items if _expiry(item) <= cutoff_date),
+                  key=lambda item: _expiry(item))
+
+
+def test_expiring_soon_sorted_by_expiry(inventory):
+    expiring = inventory.get_expiring_soon(days=3)
+    assert [_expiry(item) for item in expiring] == sorted(_expiry(item) for item in expiring)
+    assert {item.name for item in expiring} == {item.name for item in _linear_expiring(inventory, 3)}
+
+
+def test_removed_item_is_not_reported(inventory):
+    today = date.today()
+    inventory.add_item(FridgeItem("Kale", 1, "bunch", today.isoformat(), "vegetable"))
+    assert "Kale" in [item.name for item in inventory.get_expiring_soon(days=0)]
+    assert inventory.remove_item("kale")
+    assert "Kale" not in [item.name for item in inventory.get_expiring_soon(days=0)]
+
+
+def test_readded_item_is_reported_once(inventory):
+    today = date.today()
+    kale = FridgeItem("Kale", 1, "bunch", today.isoformat(), "vegetable")
+    inventory.add_item(kale)
+    inventory.remove_item("Kale")
+    kale.quantity = 1
+    inventory.add_item(kale)
+    assert [item.name for item in inventory.get_expiring_soon(days=0)].count("Kale") == 1
+
+
+def test_expiring_soon_matches_linear_scan(inventory):
+    rng = random.Random(1)
+    today = date.today()
+    removed = []
+    with inventory.batch():
+        for _ in range(2000):
+            r = rng.random()
+            if r < 0.4:
+                expiry = today + timedelta(days=rng.randint(-5, 20))
+                inventory.add_item(FridgeItem(f"item{rng.randint(0, 60)}", rng.randint(1, 3),
+                                              "piece", expiry.isoformat()))
+            elif r < 0.7 and inventory.items:
+                item = rng.choice(inventory.items)
+                quantity = item.quantity if rng.random() < 0.5 else 1
+                inventory.remove_item(item.name, quantity)
+                if item.quantity == 0:
+                    removed.append(item)
+            elif r < 0.75 and removed:
+                item = removed.pop()
+                item.quantity = 1
+                inventory.add_item(item)
+            else:
+                days = rng.randint(-3, 25)
+                expiring = inventory.get_expiring_soon(days)
+                assert [id(item) for item in sorted(expiring, key=lambda i: (_expiry(i), id(i)))] == \
+                    [id(item) for item in sorted(_linear_expiring(inventory, days),
+                                                 key=lambda i: (_expiry(i), id(i)))]
+                assert [_expiry(item) for item in expiring] == sorted(_expiry(item) for item in expiring)
+    assert inventory._positions == {id(item): idx for idx, item in enumerate(inventory.items)}
+
+
+def test_summarize_uses_expiry_order(inventory):
+    expiring, low_stock, by_category = inventory.summarize(days=3, threshold=2)
+    assert expiring == inventory.get_expiring_soon(days=3)
+    assert low_stock == inventory.get_low_stock(threshold=2)
+    assert sum(len(items) for items in by_category.values()) == len(inventory.items)
+
+
+def test_add_copied_item(inventory):
+    milk = copy.copy(inventory.items[0])
+    inventory.add_item(milk)
+    assert inventory.items[0].quantity == 2
+    assert len(inventory.items) == 10
+
+
+def test_invalid_entry_is_skipped_without_overwriting_file(tmp_path):
+    path = tmp_path / "fridge_inventory.json"
+    original = (b'[{"name":"Milk","quantity":1.5,"unit":"gallon","expiry_date":"2025-07-25"},'
+                b'{"name":"Eggs","quantity":6,"unit":"pieces","expiry_date":"2025-07-30"}]')
+    path.write_bytes(original)
+    inventory = FridgeInventory(str(path))
+    assert [item.name for item in inventory.items] == ["Eggs"]
+    inventory.add_item(FridgeItem("Kale", 1, "bunch", "2025-07-25", "vegetable"))
+    assert path.read_bytes() == original
+
+
+def test_unreadable_file_is_not_overwritten(tmp_path):
+    path = tmp_path / "fridge_inventory.json"
+    path.write_bytes(b"{broken")
+    inventory = FridgeInventory(str(path))
+    inventory.add_item(FridgeItem("Kale", 1, "bunch", "2025-07-25", "vegetable"))
+    assert path.read_bytes() == b"{broken"
+
+
+def test_duplicate_names_merge_with_earliest_expiry(tmp_path):
+    path = tmp_path / "fridge_inventory.json"
+    path.write_bytes(b'[{"name":"Milk","quantity":1,"unit":"gallon","expiry_date":"2025-07-25"},'
+                     b'{"name":"milk","quantity":2,"unit":"gallon","expiry_date":"2025-07-20"}]')
+    inventory = FridgeInventory(str(path))
+    assert [(item.name, item.quantity, item.expiry_date) for item in inventory.items] == \
+        [("Milk", 3, "2025-07-20")]
+    assert inventory.remove_item("milk", 3)
+    assert inventory.items == []
+
+
+def test_expiry_heap_is_compacted(inventory):
+    with inventory.batch():
+        for _ in range(1000):
+            inventory.add_item(FridgeItem("Jam", 1, "jar", "2030-01-01", "condiment"))
+            inventory.remove_item("Jam")
+    assert len(inventory._expiry_heap) <= 2 * len(inventory.items) + 1
+    assert len(inventory._removed_ids) <= len(inventory.items)
+
+
+def test_count_summary_matches_summarize(inventory):
+    expiring, low_stock, by_category = inventory.summarize(days=3, threshold=2)
+    assert inventory.count_summary(days=3, threshold=2) == (list(by_category), len(expiring), len(low_stock))
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from main import FridgeItem, GroceryItem, MealPlanner
+
+PLAN = {
+    "meal_plan": {"day_1": {"breakfast": "Eggs", "lunch": "Salad", "dinner": "Salmon"}},
+    "grocery_list": [{"name": "Salmon", "quantity": 1, "unit": "lb", "category": "seafood"}],
+    "notes": ["Cook the salmon first."],
+}
+
+
+class FakeStream:
+    def __init__(self, content):
+        self._parts = [content[:10], content[10:]]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._parts:
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=self._parts.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def make_planner():
+    planner = MealPlanner(api_key="test-key")
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return FakeStream(json.dumps(PLAN))
+
+    planner.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return planner, calls
+
+
+def test_cache_hit_returns_fresh_copy():
+    planner, calls = make_planner()
+    inventory = [FridgeItem("Eggs", 6, "pieces", "2025-07-30", "dairy")]
+    first = asyncio.run(planner.generate_meal_plan(inventory, days=1))
+    first["meal_plan"]["day_1"]["dinner"] = "Edited"
+    first["grocery_list"][0].quantity = 99
+    second = asyncio.run(planner.generate_meal_plan(inventory, days=1))
+    assert len(calls) == 1
+    assert second is not first
+    assert second["meal_plan"]["day_1"]["dinner"] == "Salmon"
+    assert isinstance(second["grocery_list"][0], GroceryItem)
+    assert second["grocery_list"][0].quantity == 1
+
+
+def test_cache_evicts_least_recently_used():
+    planner, calls = make_planner()
+    planner.max_cache_entries = 2
+    inventory = [FridgeItem("Eggs", 6, "pieces", "2025-07-30", "dairy")]
+    for days in (1, 2, 1, 3):
+        asyncio.run(planner.generate_meal_plan(inventory, days=days))
+    assert len(calls) == 3
+    asyncio.run(planner.generate_meal_plan(inventory, days=1))
+    assert len(calls) == 3
+    asyncio.run(planner.generate_meal_plan(inventory, days=2))
+    assert len(calls) == 4